@@ -0,0 +1,20 @@
+"""HuggingFace cache environment setup.
+
+Importing this module points the ``datasets`` library at a shared cache
+directory when ``CONTEXTTUNE_HF_CACHE`` is set, so the scripts that load
+HF datasets (task generation, image builds, instance loading) reuse one
+on-disk Arrow cache instead of each warming their own. A shared cache
+means the memory-mapped Arrow files land in page cache once and are
+reused across processes.
+
+Explicit ``HF_DATASETS_CACHE``/``HF_HOME`` settings in the environment
+always win; this only fills in defaults.
+"""
+from __future__ import annotations
+
+import os
+
+_shared_cache = os.environ.get("CONTEXTTUNE_HF_CACHE")
+if _shared_cache:
+    os.environ.setdefault("HF_DATASETS_CACHE", _shared_cache)
+    os.environ.setdefault("HF_HOME", _shared_cache)
@@ -2,8 +2,11 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Iterator
 from pathlib import Path
 
+import context_policy.datasets._hf_env  # noqa: F401  (sets HF cache env)
+
 
 def read_instance_ids(path: str | Path) -> list[str]:
     """Read instance IDs from a file, one per line.
@@ -48,6 +51,30 @@ def load_instances(
         - base_commit
         - problem_statement
     """
+    return list(
+        load_instances_iter(
+            dataset_name=dataset_name,
+            split=split,
+            instance_ids=instance_ids,
+            limit=limit,
+            tasks_file=tasks_file,
+        )
+    )
+
+
+def load_instances_iter(
+    dataset_name: str,
+    split: str,
+    instance_ids: list[str] | None = None,
+    limit: int | None = None,
+    tasks_file: str | Path | None = None,
+) -> Iterator[dict]:
+    """Yield SWE-bench instances one at a time.
+
+    Same contract as :func:`load_instances` but as a generator, so callers
+    that consume instances in a single pass never hold the full slice in
+    memory and can start work before the last row is decoded.
+    """
     if tasks_file is not None:
         instances = load_instances_from_tasks_file(tasks_file)
         if instance_ids is not None:
@@ -55,7 +82,8 @@ def load_instances(
             instances = [row for row in instances if row["instance_id"] in id_set]
         if limit is not None:
             instances = instances[:limit]
-        return instances
+        yield from instances
+        return
 
     from datasets import load_dataset
 
@@ -72,7 +100,6 @@ def load_instances(
 
     # Extract needed fields
     # Additional fields for docker-native runner: version, environment_setup_commit
-    instances = []
     for row in ds:
         inst = {
             "instance_id": row["instance_id"],
@@ -85,9 +112,7 @@ def load_instances(
             inst["version"] = row["version"]
         if "environment_setup_commit" in row:
             inst["environment_setup_commit"] = row["environment_setup_commit"]
-        instances.append(inst)
-
-    return instances
+        yield inst
 
 
 def _normalize_instance_row(row: dict) -> dict:
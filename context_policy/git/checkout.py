@@ -7,23 +7,37 @@ from pathlib import Path
 from context_policy.utils.paths import REPOS_CACHE_DIR, WORKTREES_DIR, repo_to_dirname
 
 
-def _run_git(args: list[str], cwd: Path | None = None) -> tuple[int, str, str]:
+def _run_git(
+    args: list[str],
+    cwd: Path | None = None,
+    timeout_s: int | None = None,
+) -> tuple[int, str, str]:
     """Run a git command and capture output.
 
+    stdin is closed so git can never block on a credential/hostkey prompt.
+
     Args:
         args: Git command arguments (without 'git' prefix).
         cwd: Working directory.
+        timeout_s: Optional timeout in seconds. None (the default) means no
+            timeout — clones and fetches can legitimately take minutes.
 
     Returns:
-        Tuple of (return_code, stdout, stderr).
+        Tuple of (return_code, stdout, stderr). Timeout is reported as
+        return code 124 with the error in stderr.
     """
     cmd = ["git"] + args
-    result = subprocess.run(
-        cmd,
-        cwd=cwd,
-        capture_output=True,
-        text=True,
-    )
+    try:
+        result = subprocess.run(
+            cmd,
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            stdin=subprocess.DEVNULL,
+            timeout=timeout_s,
+        )
+    except subprocess.TimeoutExpired:
+        return 124, "", f"git {' '.join(args)} timed out after {timeout_s}s"
     return result.returncode, result.stdout, result.stderr
 
 
@@ -36,7 +50,7 @@ def _get_head_commit(repo_path: Path) -> str | None:
     Returns:
         Commit SHA or None if not a git repo.
     """
-    code, stdout, _ = _run_git(["rev-parse", "HEAD"], cwd=repo_path)
+    code, stdout, _ = _run_git(["rev-parse", "HEAD"], cwd=repo_path, timeout_s=10)
     if code == 0:
         return stdout.strip()
     return None
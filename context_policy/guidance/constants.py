@@ -0,0 +1,10 @@
+"""Tuning constants with no heavy imports.
+
+Lives apart from :mod:`context_policy.guidance.tuner` so CLI scripts can
+reference limits in help text without importing the tuner's runner and
+dataset dependencies.
+"""
+from __future__ import annotations
+
+# Hard cap on hill-climbing iterations per repo.
+MAX_TUNING_ITERATIONS = 20
@@ -19,27 +19,34 @@ def get_repo_tree(repo_dir: Path, *, max_depth: int = 2) -> str:
     """Return an indented directory-tree string (depth-limited).
 
     Identical to prompt_builder._build_tree but exposed as a public API
-    so that guidance init can include it in the LLM prompt.
+    so that guidance init can include it in the LLM prompt.  Uses
+    ``os.scandir`` so entry types come from the directory read instead of
+    a stat call per entry.
     """
     lines: list[str] = [f"{repo_dir.name}/"]
 
-    def _walk(current: Path, prefix: str, depth: int) -> None:
+    def _walk(current: str, prefix: str, depth: int) -> None:
         if depth > max_depth:
             return
         try:
-            entries = sorted(current.iterdir(), key=lambda p: (not p.is_dir(), p.name.lower()))
+            with os.scandir(current) as it:
+                # (name, is_dir, path) — is_dir() is cached by DirEntry
+                raw = [(e.name, e.is_dir(), e.path) for e in it]
         except PermissionError:
             return
-        entries = [e for e in entries if not (should_ignore_dir(e.name) if e.is_dir() else should_ignore_file(e.name))]
-        for i, entry in enumerate(entries):
+        # Filter before sorting so sort keys are only computed for
+        # names that survive
+        entries = [e for e in raw if not (should_ignore_dir(e[0]) if e[1] else should_ignore_file(e[0]))]
+        entries.sort(key=lambda e: (not e[1], e[0].lower()))
+        for i, (name, is_dir, path) in enumerate(entries):
             is_last = i == len(entries) - 1
             connector = "└── " if is_last else "├── "
-            lines.append(f"{prefix}{connector}{entry.name}{'/' if entry.is_dir() else ''}")
-            if entry.is_dir() and depth < max_depth:
+            lines.append(f"{prefix}{connector}{name}{'/' if is_dir else ''}")
+            if is_dir and depth < max_depth:
                 extension = "    " if is_last else "│   "
-                _walk(entry, prefix + extension, depth + 1)
+                _walk(path, prefix + extension, depth + 1)
 
-    _walk(repo_dir, "", 1)
+    _walk(str(repo_dir), "", 1)
     return "\n".join(lines)
 
 
@@ -85,8 +92,8 @@ def detect_test_command(repo_dir: Path) -> str:
     if (repo_dir / "pytest.ini").exists() or (repo_dir / "pyproject.toml").exists():
         return "pytest"
     if (repo_dir / "setup.cfg").exists():
-        cfg = (repo_dir / "setup.cfg").read_text(encoding="utf-8", errors="ignore")
-        if "[tool:pytest]" in cfg:
+        # Byte-substring probe — no decode needed just to spot the section
+        if b"[tool:pytest]" in (repo_dir / "setup.cfg").read_bytes():
             return "pytest"
     if (repo_dir / "tox.ini").exists():
         return "tox"
@@ -30,7 +30,8 @@ from context_policy.git.checkout import checkout_repo
 # ── configuration ──────────────────────────────────────────────
 
 
-MAX_TUNING_ITERATIONS = 20
+# Re-exported for callers that already import it from here
+from context_policy.guidance.constants import MAX_TUNING_ITERATIONS  # noqa: E402
 
 
 @dataclass
@@ -375,7 +375,11 @@ def run_experiment(config: ExperimentConfig, *, dry_run: bool = False) -> Path:
         }
 
     summary_path = exp_root / "experiment_summary.json"
-    summary_path.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    # json.dump streams straight into the handle instead of building the
+    # full pretty-printed string first
+    with summary_path.open("w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+        f.write("\n")
     print(f"\n[experiment] Summary written to {summary_path}")
     print(json.dumps(summary, indent=2))
 
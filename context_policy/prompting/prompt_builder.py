@@ -1,6 +1,7 @@
 """Prompt construction for patch generation."""
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 from context_policy.utils.ignore import should_ignore_dir, should_ignore_file
@@ -14,6 +15,9 @@ def _should_ignore(name: str) -> bool:
 def _build_tree(repo_dir: Path, max_depth: int = 2) -> str:
     """Build a directory tree string with limited depth.
 
+    Uses ``os.scandir`` so the dir/file type of each entry comes from the
+    directory read itself rather than a per-entry stat call.
+
     Args:
         repo_dir: Root directory to scan.
         max_depth: Maximum depth to traverse (default 2).
@@ -23,29 +27,33 @@ def _build_tree(repo_dir: Path, max_depth: int = 2) -> str:
     """
     lines = []
 
-    def _walk(current: Path, prefix: str, depth: int) -> None:
+    def _walk(current: str, prefix: str, depth: int) -> None:
         if depth > max_depth:
             return
 
         try:
-            entries = sorted(current.iterdir(), key=lambda p: (not p.is_dir(), p.name.lower()))
+            with os.scandir(current) as it:
+                # (name, is_dir, path) — is_dir() is cached by DirEntry
+                raw = [(e.name, e.is_dir(), e.path) for e in it]
         except PermissionError:
             return
 
-        # Filter ignored entries
-        entries = [e for e in entries if not _should_ignore(e.name)]
+        # Filter ignored entries before sorting so sort keys are only
+        # computed for names that survive
+        entries = [e for e in raw if not _should_ignore(e[0])]
+        entries.sort(key=lambda e: (not e[1], e[0].lower()))
 
-        for i, entry in enumerate(entries):
+        for i, (name, is_dir, path) in enumerate(entries):
             is_last = i == len(entries) - 1
             connector = "└── " if is_last else "├── "
-            lines.append(f"{prefix}{connector}{entry.name}{'/' if entry.is_dir() else ''}")
+            lines.append(f"{prefix}{connector}{name}{'/' if is_dir else ''}")
 
-            if entry.is_dir() and depth < max_depth:
+            if is_dir and depth < max_depth:
                 extension = "    " if is_last else "│   "
-                _walk(entry, prefix + extension, depth + 1)
+                _walk(path, prefix + extension, depth + 1)
 
     lines.append(f"{repo_dir.name}/")
-    _walk(repo_dir, "", 1)
+    _walk(str(repo_dir), "", 1)
 
     return "\n".join(lines)
 
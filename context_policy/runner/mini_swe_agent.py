@@ -28,12 +28,25 @@ class DockerNotAvailableError(Exception):
     pass
 
 
+# Set once Docker has been successfully probed; a passing check is assumed
+# to hold for the rest of the process.
+_docker_checked = False
+
+
 def check_docker_available() -> None:
     """Check if Docker daemon is running and accessible.
 
+    A successful check is cached for the lifetime of the process so a
+    benchmark sweep pays for one 'docker info' round-trip instead of one
+    per instance. Set ``CONTEXT_POLICY_RECHECK_DOCKER=1`` to force
+    revalidation on every call. Failures are never cached.
+
     Raises:
         DockerNotAvailableError: If Docker is not available.
     """
+    global _docker_checked
+    if _docker_checked and not os.environ.get("CONTEXT_POLICY_RECHECK_DOCKER"):
+        return
     try:
         result = subprocess.run(
             ["docker", "info"],
@@ -55,6 +68,7 @@ def check_docker_available() -> None:
             "mini_swe_agent runner requires Docker daemon running. "
             "'docker info' timed out."
         )
+    _docker_checked = True
 
 
 def build_task_with_context(problem_statement: str, context_md: str | None) -> str:
@@ -30,6 +30,36 @@ from context_policy.runner.patch_utils import (
 # Experiment spec v1.1 uses 30 steps.
 DEFAULT_MAX_STEPS = 30
 
+# ── swebench helper imports (API varies by version) ──────────────
+# Resolved on first image lookup and memoized — including the import
+# failure — so per-instance calls don't re-raise ImportError and runs
+# that never touch Docker (single_shot, --dry_run) don't pay the heavy
+# swebench/docker import at startup. Either helper may be None when
+# swebench is absent/old.
+_SWEBENCH_HELPERS: tuple[Any, Any] | None = None
+
+
+def _swebench_helpers() -> tuple[Any, Any]:
+    """Return (get_instance_docker_image, make_test_spec), resolved once."""
+    global _SWEBENCH_HELPERS
+    if _SWEBENCH_HELPERS is None:
+        try:
+            from swebench.harness.docker_utils import get_instance_docker_image
+        except ImportError:
+            get_instance_docker_image = None
+        try:
+            from swebench.harness.test_spec import make_test_spec
+        except ImportError:
+            make_test_spec = None
+        _SWEBENCH_HELPERS = (get_instance_docker_image, make_test_spec)
+    return _SWEBENCH_HELPERS
+
+# instance_id -> resolved image name (resolution is stable within a run)
+_IMAGE_NAME_CACHE: dict[str, str] = {}
+
+# Lazily populated `docker images` listing shared across instances
+_DOCKER_IMAGE_LISTING: list[str] | None = None
+
 
 def _sum_int(v: Any) -> int:
     try:
@@ -102,6 +132,31 @@ def _docker_image_exists(image_name: str) -> bool:
         return False
 
 
+def _list_docker_images() -> list[str]:
+    """Return the local `docker images` listing, querying the daemon once.
+
+    The listing is cached for the lifetime of the process; across a large
+    benchmark this turns N daemon round-trips into one. Failures are never
+    cached — a transient daemon error leaves the cache unset so the next
+    call retries.
+    """
+    global _DOCKER_IMAGE_LISTING
+    if _DOCKER_IMAGE_LISTING is None:
+        try:
+            result = subprocess.run(
+                ["docker", "images", "--format", "{{.Repository}}:{{.Tag}}"],
+                capture_output=True,
+                text=True,
+                timeout=10,
+            )
+        except Exception:
+            return []
+        if result.returncode != 0:
+            return []
+        _DOCKER_IMAGE_LISTING = result.stdout.strip().splitlines()
+    return _DOCKER_IMAGE_LISTING
+
+
 def _get_instance_docker_image(instance: dict) -> str:
     """Resolve Docker image name for SWE-bench instance.
 
@@ -111,6 +166,9 @@ def _get_instance_docker_image(instance: dict) -> str:
     3. Query local Docker for images matching the instance_id substring
     4. Fallback: hardcoded SWE-bench naming convention
 
+    Results are cached per instance_id so repeated calls (retries, resume)
+    don't re-shell to Docker or re-run the swebench helpers.
+
     Args:
         instance: Instance dict with instance_id and optional image_name.
 
@@ -118,34 +176,42 @@ def _get_instance_docker_image(instance: dict) -> str:
         Docker image name string.
     """
     instance_id = instance["instance_id"]
+    cached = _IMAGE_NAME_CACHE.get(instance_id)
+    if cached is not None:
+        return cached
 
-    # ---------- Try swebench helpers (API varies by version) ----------
-    # Variant 1: get_instance_docker_image (newer swebench)
-    try:
-        from swebench.harness.docker_utils import get_instance_docker_image
+    image = _resolve_instance_docker_image(instance)
+    _IMAGE_NAME_CACHE[instance_id] = image
+    return image
 
-        image = get_instance_docker_image(instance)
-        print(f"  Docker image (swebench helper): {image}")
-        return image
-    except ImportError:
-        pass
-    except Exception as exc:
-        print(f"  WARNING: get_instance_docker_image failed: {exc}")
+
+def _resolve_instance_docker_image(instance: dict) -> str:
+    """Uncached resolution logic behind _get_instance_docker_image."""
+    instance_id = instance["instance_id"]
+
+    # ---------- Try swebench helpers (resolved on first call) ----------
+    get_image, make_spec = _swebench_helpers()
+
+    # Variant 1: get_instance_docker_image (newer swebench)
+    if get_image is not None:
+        try:
+            image = get_image(instance)
+            print(f"  Docker image (swebench helper): {image}")
+            return image
+        except Exception as exc:
+            print(f"  WARNING: get_instance_docker_image failed: {exc}")
 
     # Variant 2: make_test_spec → spec.instance_image_key (swebench >=2.x)
-    try:
-        from swebench.harness.test_spec import make_test_spec
-
-        spec = make_test_spec(instance)
-        image = spec.instance_image_key
-        if image and not image.endswith(":latest"):
-            image = f"{image}:latest"
-        print(f"  Docker image (test_spec): {image}")
-        return image
-    except ImportError:
-        pass
-    except Exception as exc:
-        print(f"  WARNING: make_test_spec failed: {exc}")
+    if make_spec is not None:
+        try:
+            spec = make_spec(instance)
+            image = spec.instance_image_key
+            if image and not image.endswith(":latest"):
+                image = f"{image}:latest"
+            print(f"  Docker image (test_spec): {image}")
+            return image
+        except Exception as exc:
+            print(f"  WARNING: make_test_spec failed: {exc}")
 
     # ---------- Instance field ----------
     if image_name := instance.get("image_name"):
@@ -157,20 +223,10 @@ def _get_instance_docker_image(instance: dict) -> str:
     # swebench/sweb.eval.x86_64.django_1776_django-10097:latest
     # Extract the short id (e.g. "django-10097") to search
     short_id = instance_id.split("__")[-1]  # "django-10097"
-    try:
-        result = subprocess.run(
-            ["docker", "images", "--format", "{{.Repository}}:{{.Tag}}"],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        if result.returncode == 0:
-            for line in result.stdout.strip().splitlines():
-                if short_id in line and "sweb.eval" in line:
-                    print(f"  Docker image (docker query): {line}")
-                    return line
-    except Exception:
-        pass
+    for line in _list_docker_images():
+        if short_id in line and "sweb.eval" in line:
+            print(f"  Docker image (docker query): {line}")
+            return line
 
     # ---------- Last-resort fallback ----------
     fallback = f"swebench/sweb.eval.x86_64.{instance_id}:latest"
@@ -763,7 +819,7 @@ if __name__ == "__main__":
         try:
             config_source = inspect.getsource(AgentConfig)
             print(f"\n  AgentConfig source:")
-            for line in config_source.split("\n")[:40]:
+            for line in config_source.split("\n", 40)[:40]:
                 print(f"    {line}")
         except Exception as e:
             print(f"  Could not get AgentConfig source: {e}")
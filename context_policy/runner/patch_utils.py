@@ -2,12 +2,27 @@
 from __future__ import annotations
 
 import json
+import os
 import re
+from json.decoder import scanstring
 
 
 # Maximum allowed patch size (chars) - safety limit
 MAX_PATCH_SIZE = 200_000
 
+# Trajectory files above this size get a head-probe fast path instead of
+# an eager full-tree json.load (patches usually sit at the top level).
+_TRAJ_PROBE_THRESHOLD = 1_000_000
+_TRAJ_PROBE_BYTES = 65_536
+
+# Matches a patch-carrying key followed by the opening quote of its value
+_PATCH_KEY_RE = re.compile(r'"(?:patch|model_patch|diff)"\s*:\s*"')
+
+# Diff extraction patterns, compiled once (extract_diff runs per agent response)
+_FENCE_RE = re.compile(r"```(?:diff)?\s*\n(.*?)```", re.DOTALL)
+_DIFF_GIT_RE = re.compile(r"^diff --git ", re.MULTILINE)
+_TRIPLE_DASH_RE = re.compile(r"^--- ", re.MULTILINE)
+
 
 def extract_diff(text: str) -> str:
     """Extract unified diff from model output.
@@ -24,36 +39,100 @@ def extract_diff(text: str) -> str:
     Returns:
         Extracted diff string or empty string.
     """
-    # Try fenced diff block
-    fence_pattern = r"```(?:diff)?\s*\n(.*?)```"
-    matches = re.findall(fence_pattern, text, re.DOTALL)
-    if matches:
-        # Return the first fenced block that looks like a diff
-        for match in matches:
-            if "---" in match or "diff --git" in match:
-                return match.strip()
-
-    # Try to find diff --git line
-    lines = text.split("\n")
-    for i, line in enumerate(lines):
-        if line.startswith("diff --git "):
-            return "\n".join(lines[i:]).strip()
+    # Try fenced diff block — return the first one that looks like a diff
+    for fence_match in _FENCE_RE.finditer(text):
+        block = fence_match.group(1)
+        if "---" in block or "diff --git" in block:
+            return block.strip()
+
+    # Try to find diff --git line; slice from its offset instead of
+    # splitting the whole text into a line list
+    match = _DIFF_GIT_RE.search(text)
+    if match:
+        return text[match.start():].strip()
 
     # Try to find --- line (start of unified diff)
-    for i, line in enumerate(lines):
-        if line.startswith("--- "):
-            return "\n".join(lines[i:]).strip()
+    match = _TRIPLE_DASH_RE.search(text)
+    if match:
+        return text[match.start():].strip()
 
     return ""
 
 
+def _iter_top_level_matches(head: str):
+    """Yield _PATCH_KEY_RE matches that sit at the top level of the JSON.
+
+    Walks the head once, tracking string state and brace/bracket depth, so
+    per-step ``"patch"`` keys nested inside ``steps``/``actions`` lists are
+    skipped — the full parse prefers the top-level field over those, and
+    the probe must not invert that preference.
+    """
+    depth = 0
+    in_string = False
+    escaped = False
+    pos = 0
+    for match in _PATCH_KEY_RE.finditer(head):
+        while pos < match.start():
+            ch = head[pos]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            else:
+                if ch == '"':
+                    in_string = True
+                elif ch == "{" or ch == "[":
+                    depth += 1
+                elif ch == "}" or ch == "]":
+                    depth -= 1
+            pos += 1
+        if depth == 1 and not in_string:
+            yield match
+
+
+def _probe_head_for_patch(traj_path: str) -> str:
+    """Fast path for large trajectories: scan the file head for a patch field.
+
+    Reads only the first ``_TRAJ_PROBE_BYTES`` of the file and looks for a
+    *top-level* ``"patch"`` / ``"model_patch"`` / ``"diff"`` key; nested
+    matches (e.g. per-step patches) are ignored so a stale intermediate
+    diff can't shadow the final one. The matched JSON string value is
+    decoded with the stdlib ``scanstring`` (handles escapes). The result
+    is only trusted if it actually looks like a diff; anything else is
+    inconclusive and the caller falls back to the full parse.
+
+    Returns:
+        Extracted diff string, or "" if the probe was inconclusive.
+    """
+    try:
+        with open(traj_path, "r", encoding="utf-8", errors="replace") as f:
+            head = f.read(_TRAJ_PROBE_BYTES)
+    except OSError:
+        return ""
+
+    for match in _iter_top_level_matches(head):
+        try:
+            value, _ = scanstring(head, match.end())
+        except ValueError:
+            # String value extends past the probe window (or is malformed)
+            continue
+        value = value.strip()
+        if value and ("diff --git" in value or value.startswith("--- ")):
+            return value
+    return ""
+
+
 def extract_patch_from_trajectory(traj_path: str) -> str:
     """Extract patch from a mini-swe-agent trajectory JSON file.
 
     Tries in order:
-    1. Top-level 'patch' or 'model_patch' field
-    2. Last action/step with a diff in its output
-    3. Empty string if no patch found
+    1. Head-probe fast path for large files (patch is usually top-level)
+    2. Top-level 'patch' or 'model_patch' field
+    3. Last action/step with a diff in its output
+    4. Empty string if no patch found
 
     Args:
         traj_path: Path to trajectory JSON file.
@@ -61,6 +140,17 @@ def extract_patch_from_trajectory(traj_path: str) -> str:
     Returns:
         Extracted patch string or empty string.
     """
+    # Avoid parsing multi-MB trajectory trees when the patch sits near the
+    # top of the file — O(probe) instead of O(file) for the common case.
+    try:
+        large = os.stat(traj_path).st_size > _TRAJ_PROBE_THRESHOLD
+    except OSError:
+        return ""
+    if large:
+        probed = _probe_head_for_patch(traj_path)
+        if probed:
+            return probed
+
     try:
         with open(traj_path, "r", encoding="utf-8") as f:
             data = json.load(f)
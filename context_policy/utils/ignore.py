@@ -46,6 +46,16 @@ IGNORE_DIR_PATTERNS: frozenset[str] = frozenset({
     "*.egg-info",
 })
 
+# Suffixes extracted from the * patterns once at import; str.endswith
+# accepts a tuple and dispatches in C, so the per-entry checks below
+# avoid a Python-level pattern loop.
+_IGNORE_DIR_SUFFIXES: tuple[str, ...] = tuple(
+    p[1:] for p in IGNORE_DIR_PATTERNS if p.startswith("*")
+)
+_IGNORE_FILE_SUFFIXES: tuple[str, ...] = tuple(
+    p[1:] for p in IGNORE_FILES if p.startswith("*")
+)
+
 
 def should_ignore_dir(name: str) -> bool:
     """Check if a directory name should be ignored.
@@ -56,13 +66,7 @@ def should_ignore_dir(name: str) -> bool:
     Returns:
         True if should be ignored.
     """
-    if name in IGNORE_DIRS:
-        return True
-    # Check suffix patterns
-    for pattern in IGNORE_DIR_PATTERNS:
-        if pattern.startswith("*") and name.endswith(pattern[1:]):
-            return True
-    return False
+    return name in IGNORE_DIRS or name.endswith(_IGNORE_DIR_SUFFIXES)
 
 
 def should_ignore_file(name: str) -> bool:
@@ -74,10 +78,4 @@ def should_ignore_file(name: str) -> bool:
     Returns:
         True if should be ignored.
     """
-    if name in IGNORE_FILES:
-        return True
-    # Check suffix patterns
-    for pattern in IGNORE_FILES:
-        if pattern.startswith("*") and name.endswith(pattern[1:]):
-            return True
-    return False
+    return name in IGNORE_FILES or name.endswith(_IGNORE_FILE_SUFFIXES)
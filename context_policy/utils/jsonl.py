@@ -2,26 +2,44 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Iterable
 from pathlib import Path
 from typing import Any
 
+from context_policy.utils.paths import ensure_dir
 
-def write_jsonl(path: str | Path, records: list[dict[str, Any]]) -> None:
+# Optional C-level encoder/decoder. Not a project dependency — the stdlib
+# path below is always available and produces identical lines.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def write_jsonl(path: str | Path, records: Iterable[dict[str, Any]]) -> None:
     """Write records to a JSONL file.
 
     Each record is written as a single-line JSON object with sorted keys,
-    UTF-8 encoding, and newline termination.
+    UTF-8 encoding, and newline termination. Records are encoded and
+    written as they are consumed, so generators stream through without
+    being materialized.
 
     Args:
         path: Output file path. Parent directories are created if needed.
-        records: List of dictionaries to write.
+        records: Iterable of dictionaries to write (list or generator).
     """
     path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
+    ensure_dir(path.parent)
+    if orjson is not None:
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE
+        with path.open("wb") as f:
+            f.writelines(orjson.dumps(record, option=option) for record in records)
+        return
     with path.open("w", encoding="utf-8") as f:
-        for record in records:
-            line = json.dumps(record, sort_keys=True, ensure_ascii=False)
-            f.write(line + "\n")
+        f.writelines(
+            json.dumps(record, sort_keys=True, ensure_ascii=False) + "\n"
+            for record in records
+        )
 
 
 def read_jsonl(path: str | Path) -> list[dict[str, Any]]:
@@ -34,10 +52,13 @@ def read_jsonl(path: str | Path) -> list[dict[str, Any]]:
         List of dictionaries parsed from the file.
     """
     path = Path(path)
+    loads = json.loads if orjson is None else orjson.loads
     records = []
-    with path.open("r", encoding="utf-8") as f:
+    with path.open("rb") as f:
         for line in f:
-            line = line.strip()
-            if line:
-                records.append(json.loads(line))
+            # Both decoders tolerate surrounding whitespace, so blank-line
+            # skipping is the only reason to inspect the line — isspace()
+            # checks without allocating a stripped copy.
+            if not line.isspace():
+                records.append(loads(line))
     return records
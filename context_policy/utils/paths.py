@@ -17,6 +17,25 @@ WORKTREES_DIR = ARTIFACTS_DIR / "worktrees"
 # Results directory
 RESULTS_DIR = PROJECT_ROOT / "results"
 
+# Directories already created by this process — lets hot write paths skip
+# the mkdir/stat syscalls after the first call per directory.
+_MKDIR_CACHE: set[str] = set()
+
+
+def ensure_dir(path: Path) -> None:
+    """Create a directory (with parents) unless this process already has.
+
+    Safe to use for output directories that only this process mutates;
+    callers racing with external deleters should call Path.mkdir directly.
+
+    Args:
+        path: Directory to create.
+    """
+    key = str(path)
+    if key not in _MKDIR_CACHE:
+        path.mkdir(parents=True, exist_ok=True)
+        _MKDIR_CACHE.add(key)
+
 
 def repo_to_dirname(repo: str) -> str:
     """Convert repo slug to filesystem-safe directory name.
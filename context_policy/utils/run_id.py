@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import secrets
-from datetime import datetime
+import time
 
 
 def make_run_id(prefix: str) -> str:
@@ -16,6 +16,7 @@ def make_run_id(prefix: str) -> str:
     Returns:
         A unique run ID string safe for use in file paths.
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # time.strftime formats local time in one C call — no datetime object
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
     suffix = secrets.token_hex(2)  # 4 hex chars
     return f"{prefix}_{timestamp}_{suffix}"
@@ -6,6 +6,8 @@ import subprocess
 from pathlib import Path
 from typing import Any
 
+from context_policy.utils.paths import ensure_dir
+
 
 def run(
     cmd: list[str],
@@ -31,22 +33,24 @@ def run(
     """
     run_env: dict[str, str] | None = None
     if env is not None:
-        run_env = {**os.environ, **env}
+        run_env = os.environ | env
 
     if stdout_path:
         stdout_path = Path(stdout_path)
-        stdout_path.parent.mkdir(parents=True, exist_ok=True)
+        ensure_dir(stdout_path.parent)
     if stderr_path:
         stderr_path = Path(stderr_path)
-        stderr_path.parent.mkdir(parents=True, exist_ok=True)
+        ensure_dir(stderr_path.parent)
 
     stdout_file: Any = None
     stderr_file: Any = None
     try:
+        # Binary handles: the child writes straight to the inherited fd, so
+        # there is no Python text layer to pay for (and nothing to decode).
         if stdout_path:
-            stdout_file = open(stdout_path, "w", encoding="utf-8")
+            stdout_file = open(stdout_path, "wb")
         if stderr_path:
-            stderr_file = open(stderr_path, "w", encoding="utf-8")
+            stderr_file = open(stderr_path, "wb")
 
         proc = subprocess.Popen(
             cmd,
@@ -54,7 +58,6 @@ def run(
             env=run_env,
             stdout=stdout_file if stdout_file else subprocess.DEVNULL,
             stderr=stderr_file if stderr_file else subprocess.DEVNULL,
-            text=True,
         )
         try:
             proc.wait(timeout=timeout_s)
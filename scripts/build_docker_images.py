@@ -10,41 +10,81 @@ Usage:
 """
 from __future__ import annotations
 
-import json
+import os
 import subprocess
 import sys
 import tempfile
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-
-from context_policy.datasets.swebench import load_instances, read_instance_ids
-
-
-def _images_exist(instance_ids: list[str]) -> dict[str, str | None]:
+_root = os.environ.get("CONTEXTTUNE_ROOT") or os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))
+)
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+
+import context_policy.datasets._hf_env  # noqa: F401  (sets HF cache env)
+from context_policy.datasets.swebench import read_instance_ids
+from context_policy.utils.jsonl import write_jsonl
+
+
+# Cached sweb.eval image names; `docker images` itself can take seconds
+# on hosts with many images, so shell out at most once per pass.
+_SWEB_IMAGES: list[str] | None = None
+
+
+def _list_sweb_images(*, refresh: bool = False) -> list[str]:
+    """Return local sweb.eval image names, caching the docker query."""
+    global _SWEB_IMAGES
+    if _SWEB_IMAGES is None or refresh:
+        try:
+            result = subprocess.run(
+                ["docker", "images", "--format", "{{.Repository}}:{{.Tag}}"],
+                capture_output=True,
+                timeout=30,
+            )
+            listing = result.stdout.splitlines() if result.returncode == 0 else []
+        except Exception:
+            listing = []
+        # Filter in bytes and decode only the sweb.eval names we keep —
+        # the full listing can be MB-scale on busy hosts.
+        _SWEB_IMAGES = [
+            img.decode("utf-8", "replace") for img in listing if b"sweb.eval" in img
+        ]
+    return _SWEB_IMAGES
+
+
+def _images_exist(instance_ids: list[str], *, refresh: bool = False) -> dict[str, str | None]:
     """Check which SWE-bench Docker images already exist locally.
 
-    Returns a dict mapping instance_id -> image name (or None if missing).
+    Args:
+        instance_ids: Instance IDs to look up.
+        refresh: Re-query the Docker daemon instead of using the cached
+            listing (needed after a build pass).
+
+    Returns:
+        A dict mapping instance_id -> image name (or None if missing).
     """
-    try:
-        result = subprocess.run(
-            ["docker", "images", "--format", "{{.Repository}}:{{.Tag}}"],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        all_images = result.stdout.strip().splitlines() if result.returncode == 0 else []
-    except Exception:
-        all_images = []
+    sweb_images = _list_sweb_images(refresh=refresh)
+
+    # SWE-bench encodes "__" in instance ids as "_1776_" in image names,
+    # e.g. django__django-10097 -> sweb.eval.x86_64.django_1776_django-10097.
+    # Index on that token for O(1) lookups; keep a substring fallback for
+    # images produced by other naming conventions.
+    index: dict[str, str] = {}
+    for img in sweb_images:
+        name = img.rsplit(":", 1)[0]
+        token = name.rsplit(".", 1)[-1]
+        index.setdefault(token, img)
 
     mapping: dict[str, str | None] = {}
     for iid in instance_ids:
-        short_id = iid.split("__")[-1]  # e.g. "django-10097"
-        found = None
-        for img in all_images:
-            if short_id in img and "sweb.eval" in img:
-                found = img
-                break
+        found = index.get(iid.replace("__", "_1776_"))
+        if found is None:
+            short_id = iid.split("__")[-1]  # e.g. "django-10097"
+            for img in sweb_images:
+                if short_id in img:
+                    found = img
+                    break
         mapping[iid] = found
     return mapping
 
@@ -70,8 +110,8 @@ def main() -> int:
     parser.add_argument(
         "--max_workers",
         type=int,
-        default=1,
-        help="Parallel workers for image building (default: 1).",
+        default=max(1, (os.cpu_count() or 2) // 2),
+        help="Parallel workers for image building (default: half the CPUs).",
     )
     parser.add_argument(
         "--force",
@@ -104,29 +144,25 @@ def main() -> int:
     else:
         build_ids = instance_ids
 
-    # Load full instance data (needed by swebench harness)
-    print("Loading instance data from dataset...")
-    instances = load_instances(
-        dataset_name=args.dataset_name,
-        split=args.split,
-        instance_ids=build_ids,
-    )
-
-    # Write dummy predictions JSONL (non-empty patch to force image build)
+    # Write dummy predictions JSONL (non-empty patch to force image build).
+    # The harness loads instance data itself from --dataset_name, so the
+    # predictions file only needs the instance ids we already have.
     dummy_patch = "--- a/dummy.txt\n+++ b/dummy.txt\n@@ -0,0 +1 @@\n+dummy\n"
-    with tempfile.NamedTemporaryFile(
-        mode="w", suffix=".jsonl", delete=False, encoding="utf-8"
-    ) as f:
-        for inst in instances:
-            record = {
-                "instance_id": inst["instance_id"],
+    fd, preds_path = tempfile.mkstemp(suffix=".jsonl")
+    os.close(fd)
+    write_jsonl(
+        preds_path,
+        (
+            {
+                "instance_id": iid,
                 "model_name_or_path": "dummy",
                 "model_patch": dummy_patch,
             }
-            f.write(json.dumps(record) + "\n")
-        preds_path = f.name
+            for iid in build_ids
+        ),
+    )
 
-    print(f"Building {len(instances)} Docker images...")
+    print(f"Building {len(build_ids)} Docker images...")
     print(f"  Dummy predictions: {preds_path}")
     print(f"  Workers: {args.max_workers}")
     print()
@@ -149,10 +185,15 @@ def main() -> int:
     except OSError:
         pass
 
-    # Verify images were built
+    # A clean harness exit means every image built; skip the docker re-scan
+    # and only fall back to one refreshed listing to classify failures.
     print()
-    print("Verifying images...")
-    final = _images_exist(build_ids)
+    if result.returncode == 0:
+        print(f"Result: {len(build_ids)} built, 0 missing")
+        return 0
+
+    print("Harness exited non-zero; verifying images...")
+    final = _images_exist(build_ids, refresh=True)
     ok = 0
     fail = 0
     for iid, img in final.items():
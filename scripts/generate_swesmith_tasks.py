@@ -15,11 +15,21 @@ from the repo's git history as a fallback.
 from __future__ import annotations
 
 import argparse
-import json
+import hashlib
+import os
 import random
 import sys
 from pathlib import Path
 
+_root = os.environ.get("CONTEXTTUNE_ROOT") or os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))
+)
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+
+import context_policy.datasets._hf_env  # noqa: F401  (sets HF cache env)
+from context_policy.utils.jsonl import write_jsonl
+
 
 # 12 repos used in the experiment
 REPOS = [
@@ -73,18 +83,19 @@ def generate_tasks_swesmith(
         return generate_tasks_from_hf(repo, commit, n, output_path)
 
     bugs = generate_bugs(repo=repo, commit=commit, n=n)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    with output_path.open("w", encoding="utf-8") as f:
-        for bug in bugs:
-            record = {
-                "instance_id": bug.get("instance_id", f"{repo.replace('/', '__')}__{bug.get('id', '')}"),
-                "repo": repo,
+    write_jsonl(
+        output_path,
+        (
+            {
                 "base_commit": bug.get("base_commit", commit),
+                "instance_id": bug.get("instance_id", f"{repo.replace('/', '__')}__{bug.get('id', '')}"),
                 "problem_statement": bug.get("problem_statement", bug.get("issue", "")),
+                "repo": repo,
                 "source": "swe_smith",
             }
-            f.write(json.dumps(record, sort_keys=True, ensure_ascii=False) + "\n")
+            for bug in bugs
+        ),
+    )
 
     return len(bugs)
 
@@ -132,20 +143,29 @@ def _row_to_task(row: dict, repo: str, default_commit: str) -> dict | None:
     if not instance_id or not base_commit:
         return None
 
+    # Keys in sorted order so insertion order already matches the writer's
+    # sorted output.
     return {
-        "instance_id": str(instance_id),
-        "repo": repo,
         "base_commit": str(base_commit),
+        "instance_id": str(instance_id),
         "problem_statement": str(problem_statement),
+        "repo": repo,
         "source": "swe_smith_hf",
     }
 
 
-def generate_tasks_from_hf(repo: str, commit: str, n: int, output_path: Path) -> int:
-    """Fallback task generator using HF SWE-smith dataset.
+# Matching HF rows per repo key, filled on first use. Train and holdout
+# generation hit the same repo back to back, so caching saves a full pass
+# over the dataset per call after the first.
+_HF_HITS_CACHE: dict[str, list[dict]] = {}
+
+
+def _load_hf_hits(repo_key: str) -> list[dict]:
+    """Collect SWE-smith HF rows matching a repo key, caching per process."""
+    hits = _HF_HITS_CACHE.get(repo_key)
+    if hits is not None:
+        return hits
 
-    This path is used when local swesmith generation APIs are unavailable.
-    """
     try:
         from datasets import load_dataset
     except ImportError as exc:
@@ -153,31 +173,59 @@ def generate_tasks_from_hf(repo: str, commit: str, n: int, output_path: Path) ->
             "datasets is required for SWE-smith HF fallback. Install with: pip install datasets"
         ) from exc
 
-    ds = load_dataset("SWE-bench/SWE-smith", split="train")
+    # Stream so only matching rows are materialized as Python objects —
+    # each repo keeps roughly 1/12th of the multi-repo dataset, and the
+    # non-matching rows never leave Arrow.
+    try:
+        ds = load_dataset("SWE-bench/SWE-smith", split="train", streaming=True)
+    except Exception:
+        ds = load_dataset("SWE-bench/SWE-smith", split="train")
+
+    repo_prefix = f"swesmith/{repo_key}."
+    iid_prefix = f"{repo_key}."
+    hits = [
+        row
+        for row in ds
+        if str(row.get("repo", "")).lower().startswith(repo_prefix)
+        or str(row.get("instance_id", "")).lower().startswith(iid_prefix)
+    ]
+    _HF_HITS_CACHE[repo_key] = hits
+    return hits
+
 
+def generate_tasks_from_hf(repo: str, commit: str, n: int, output_path: Path) -> int:
+    """Fallback task generator using HF SWE-smith dataset.
+
+    This path is used when local swesmith generation APIs are unavailable.
+    """
     repo_key = _repo_to_hf_key(repo)
     repo_prefix = f"swesmith/{repo_key}."
     iid_prefix = f"{repo_key}."
 
-    hits = ds.filter(
-        lambda x: str(x.get("repo", "")).lower().startswith(repo_prefix)
-        or str(x.get("instance_id", "")).lower().startswith(iid_prefix),
-        num_proc=1,
-    )
+    hits = _load_hf_hits(repo_key)
 
-    if len(hits) == 0:
+    if not hits:
         raise RuntimeError(
             f"No SWE-smith HF rows found for repo={repo}. "
             f"Tried repo_prefix={repo_prefix} iid_prefix={iid_prefix}."
         )
 
-    # HF fallback ignores caller commit pin and samples from available repo rows.
+    # HF fallback ignores caller commit pin and samples from available repo
+    # rows. The seed is derived with blake2b so it is stable across
+    # interpreter runs (unlike hash()), and sample() is O(n) where a
+    # shuffle-and-truncate would be O(len(hits)).
     if n < len(hits):
-        hits = hits.shuffle(seed=0).select(range(n))
+        seed = int.from_bytes(
+            hashlib.blake2b(f"{repo}:{commit}".encode(), digest_size=8).digest(),
+            "little",
+        )
+        hits = random.Random(seed).sample(hits, n)
 
     rows = []
     for row in hits:
-        task = _row_to_task(dict(row), repo=repo, default_commit=commit)
+        # Rows are already plain dicts here; _row_to_task only reads from
+        # them, so no defensive copy is needed.
+        task = _row_to_task(row, repo=repo, default_commit=commit)
         if task is not None:
             rows.append(task)
 
@@ -187,10 +235,7 @@ def generate_tasks_from_hf(repo: str, commit: str, n: int, output_path: Path) ->
             f"Tried repo_prefix={repo_prefix} iid_prefix={iid_prefix}."
         )
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with output_path.open("w", encoding="utf-8") as f:
-        for task in rows:
-            f.write(json.dumps(task, sort_keys=True, ensure_ascii=False) + "\n")
+    write_jsonl(output_path, rows)
 
     return len(rows)
 
@@ -223,28 +268,26 @@ def generate_tasks_fallback(
         print(f"  git log failed: {result.stderr[:200]}", file=sys.stderr)
         return 0
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    count = 0
     repo_slug = repo.replace("/", "__")
-
-    with output_path.open("w", encoding="utf-8") as f:
-        for line in result.stdout.strip().splitlines():
-            if not line.strip():
-                continue
-            parts = line.split(" ", 1)
-            sha = parts[0]
-            msg = parts[1] if len(parts) > 1 else "Fix issue"
-            record = {
-                "instance_id": f"{repo_slug}__{sha[:8]}",
-                "repo": repo,
+    records = []
+    for line in result.stdout.strip().splitlines():
+        if not line.strip():
+            continue
+        parts = line.split(" ", 1)
+        sha = parts[0]
+        msg = parts[1] if len(parts) > 1 else "Fix issue"
+        records.append(
+            {
                 "base_commit": sha,
+                "instance_id": f"{repo_slug}__{sha[:8]}",
                 "problem_statement": f"Issue: {msg}",
+                "repo": repo,
                 "source": "fallback",
             }
-            f.write(json.dumps(record, sort_keys=True, ensure_ascii=False) + "\n")
-            count += 1
+        )
 
-    return count
+    write_jsonl(output_path, records)
+    return len(records)
 
 
 def main() -> None:
@@ -24,13 +24,18 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import sys
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+_root = os.environ.get("CONTEXTTUNE_ROOT") or os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))
+)
+if _root not in sys.path:
+    sys.path.insert(0, _root)
 
 from context_policy.loop.orchestrator import ExperimentConfig, run_experiment
-from context_policy.guidance.tuner import MAX_TUNING_ITERATIONS
+from context_policy.guidance.constants import MAX_TUNING_ITERATIONS
 from context_policy.utils.run_id import make_run_id
 
 
@@ -97,12 +102,13 @@ def main() -> None:
         max_workers_eval=args.max_workers_eval,
     )
 
-    print(f"Experiment: {experiment_id}")
-    print(f"Model: {args.model}")
-    print(f"Repos: {len(repos)}")
-    print(f"Tuning: T={args.iterations}, K={args.candidates}, N={args.tasks_per_score}")
-    print(f"Dry run: {args.dry_run}")
-    print()
+    sys.stdout.write(
+        f"Experiment: {experiment_id}\n"
+        f"Model: {args.model}\n"
+        f"Repos: {len(repos)}\n"
+        f"Tuning: T={args.iterations}, K={args.candidates}, N={args.tasks_per_score}\n"
+        f"Dry run: {args.dry_run}\n\n"
+    )
 
     result_dir = run_experiment(config, dry_run=args.dry_run)
     print(f"\nExperiment complete. Results: {result_dir}")
@@ -3,36 +3,58 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import json
+import os
+import re
 import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add parent to path for imports
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+_root = os.environ.get("CONTEXTTUNE_ROOT") or os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))
+)
+if _root not in sys.path:
+    sys.path.insert(0, _root)
 
-from context_policy.datasets.swebench import load_instances, read_instance_ids
+from context_policy.datasets.swebench import load_instances_iter, read_instance_ids
 from context_policy.runner.mini_swe_agent import generate_patch_with_mini
 from context_policy.runner.mini_swe_agent_swebench import generate_patch_with_mini_swebench
 from context_policy.runner.single_shot import generate_patch
-from context_policy.utils.jsonl import read_jsonl
-from context_policy.utils.paths import LOGS_DIR, PREDS_DIR
+from context_policy.utils.paths import LOGS_DIR, PREDS_DIR, repo_to_dirname
 from context_policy.utils.run_id import make_run_id
 
 
+# Predictions are written with sorted keys, so instance_id is the first
+# field on every line; a regex pulls it out without parsing the (possibly
+# large) model_patch field.
+_INSTANCE_ID_RE = re.compile(rb'"instance_id"\s*:\s*"([^"]+)"')
+
+
 def get_completed_ids(preds_path: Path) -> set[str]:
     """Get set of already-completed instance IDs from predictions file."""
     if not preds_path.exists():
         return set()
-    records = read_jsonl(preds_path)
-    return {r["instance_id"] for r in records}
+    ids = set()
+    with preds_path.open("rb") as f:
+        for line in f:
+            m = _INSTANCE_ID_RE.search(line)
+            if m:
+                ids.add(m.group(1).decode("utf-8"))
+    return ids
 
 
-def append_prediction(preds_path: Path, record: dict) -> None:
-    """Append a single prediction record to JSONL file."""
-    preds_path.parent.mkdir(parents=True, exist_ok=True)
-    line = json.dumps(record, sort_keys=True, ensure_ascii=False) + "\n"
-    with preds_path.open("a", encoding="utf-8") as f:
-        f.write(line)
+def append_prediction(preds_file, record: dict) -> None:
+    """Append a single prediction record to an open JSONL handle.
+
+    The handle is line-buffered, so each record reaches the file as one
+    write without reopening the path per prediction.
+    """
+    preds_file.write(json.dumps(record, sort_keys=True, ensure_ascii=False) + "\n")
 
 
 def write_instance_log(
@@ -42,28 +64,45 @@ def write_instance_log(
     diff_extracted: bool,
     diff_preview: str,
 ) -> None:
-    """Write per-instance debug log."""
-    logs_dir.mkdir(parents=True, exist_ok=True)
+    """Write per-instance debug log.
+
+    The caller creates ``logs_dir`` once per run; the log body is built
+    in memory and written in one call.
+    """
     log_path = logs_dir / f"{instance_id}.log"
-    with log_path.open("w", encoding="utf-8") as f:
-        f.write(f"instance_id: {instance_id}\n")
-        f.write(f"prompt_length_chars: {prompt_len}\n")
-        f.write(f"diff_extracted: {diff_extracted}\n")
-        f.write(f"diff_preview (first 5 lines):\n")
-        f.write(diff_preview + "\n")
+    log_path.write_text(
+        f"instance_id: {instance_id}\n"
+        f"prompt_length_chars: {prompt_len}\n"
+        f"diff_extracted: {diff_extracted}\n"
+        f"diff_preview (first 5 lines):\n"
+        f"{diff_preview}\n",
+        encoding="utf-8",
+    )
+
+
+@functools.lru_cache(maxsize=128)
+def _load_commit_context(commit_dir: str) -> str:
+    """Read the legacy per-commit context.md, cached per (repo, commit) dir.
+
+    Verified instances cluster on shared base commits, so without the
+    cache the same file is re-read for every instance in the cluster.
+    """
+    try:
+        return (Path(commit_dir) / "context.md").read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return ""
 
 
 def load_context(contexts_root: Path, repo: str, commit: str, instance_id: str) -> str:
     """Load context file if it exists."""
-    from context_policy.utils.paths import repo_to_dirname
-    # Try instance-specific path first, then fall back to legacy path
-    instance_path = contexts_root / repo_to_dirname(repo) / commit / instance_id / "context.md"
-    if instance_path.exists():
-        return instance_path.read_text(encoding="utf-8")
-    legacy_path = contexts_root / repo_to_dirname(repo) / commit / "context.md"
-    if legacy_path.exists():
-        return legacy_path.read_text(encoding="utf-8")
-    return ""
+    # Try instance-specific path first, then fall back to legacy path.
+    # EAFP: open directly and let the miss raise, instead of a stat per
+    # lookup before every read.
+    commit_dir = contexts_root / repo_to_dirname(repo) / commit
+    try:
+        return (commit_dir / instance_id / "context.md").read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return _load_commit_context(str(commit_dir))
 
 
 def main() -> None:
@@ -157,6 +196,24 @@ def main() -> None:
         default=30,
         help="Agent step limit for mini_swe_agent_swebench runner (default: 30; 0=unlimited).",
     )
+    parser.add_argument(
+        "--max_concurrency",
+        type=int,
+        default=1,
+        help="Number of instances to process in parallel (default: 1).",
+    )
+    parser.add_argument(
+        "--skip_ids_file",
+        default=None,
+        help="Path to file with instance IDs to skip (one per line).",
+    )
+    parser.add_argument(
+        "--deadline_s",
+        type=float,
+        default=None,
+        help="Overall wall-clock budget in seconds; remaining instances "
+             "are dropped once it is exceeded (default: no deadline).",
+    )
     parser.add_argument(
         "--guidance_dir",
         default=None,
@@ -190,8 +247,9 @@ def main() -> None:
     else:
         preds_path = Path("artifacts") / "preds" / run_id / "preds.jsonl"
 
-    # Logs directory
+    # Logs directory (created once here; per-instance logs assume it exists)
     logs_dir = Path("artifacts") / "logs" / run_id
+    logs_dir.mkdir(parents=True, exist_ok=True)
 
     print(f"Run ID: {run_id}")
     print(f"Output: {preds_path}")
@@ -205,22 +263,34 @@ def main() -> None:
         instance_ids = read_instance_ids(args.instance_ids_file)
         print(f"Loaded {len(instance_ids)} instance IDs from {args.instance_ids_file}")
 
-    # Load instances
+    # Stream instances so inference starts before the slice is fully
+    # decoded and the full list is never held in memory.
     print("Loading instances from dataset...")
-    instances = load_instances(
+    instances = load_instances_iter(
         dataset_name=args.dataset_name,
         split=args.split,
         instance_ids=instance_ids,
         limit=args.limit,
         tasks_file=args.tasks_file,
     )
-    print(f"Loaded {len(instances)} instances")
+    if instance_ids is not None:
+        total: int | str = len(instance_ids)
+    elif args.limit:
+        total = args.limit
+    else:
+        total = "?"
 
     # Get already-completed IDs for resume
     completed_ids = get_completed_ids(preds_path)
     if completed_ids:
         print(f"Resuming: {len(completed_ids)} already completed")
 
+    # Explicitly skipped IDs (known-failing or out of scope for this run)
+    skip_ids: set[str] = set()
+    if args.skip_ids_file:
+        skip_ids = set(read_instance_ids(args.skip_ids_file))
+        print(f"Skipping {len(skip_ids)} instance IDs from {args.skip_ids_file}")
+
     # Context root for baseline/tuned modes
     contexts_root = Path(args.contexts_root)
 
@@ -239,16 +309,87 @@ def main() -> None:
         if guidance_map:
             print(f"Loaded guidance for {len(guidance_map)} repos")
 
-    # Process each instance
-    for i, instance in enumerate(instances):
+    # Resolve the runner once up front — the choice is fixed for the whole
+    # run, so the per-instance path carries no dispatch chain.
+    if args.dry_run:
+        def generate(instance: dict, context_md: str | None) -> str:
+            return ""  # Empty patch for plumbing validation
+    elif args.runner == "single_shot":
+        def generate(instance: dict, context_md: str | None) -> str:
+            return generate_patch(
+                instance=instance,
+                model=args.model,
+                context_md=context_md,
+                temperature=0.0,
+                top_p=1.0,
+                max_tokens=args.max_tokens,
+                timeout_s=args.timeout_s,
+            )
+    elif args.runner == "mini_swe_agent":
+        def generate(instance: dict, context_md: str | None) -> str:
+            return generate_patch_with_mini(
+                instance=instance,
+                model=args.model,
+                context_md=context_md,
+                timeout_s=args.timeout_s,
+                cost_limit=args.cost_limit,
+            )
+    elif args.runner == "mini_swe_agent_swebench":
+        def generate(instance: dict, context_md: str | None) -> str:
+            return generate_patch_with_mini_swebench(
+                instance=instance,
+                model=args.model,
+                context_md=context_md,
+                timeout_s=args.timeout_s,
+                traj_dir=logs_dir / "trajectories",
+                step_limit=args.step_limit,
+            )
+    else:
+        raise ValueError(f"Unknown runner: {args.runner}")
+
+    # Serializes prediction appends (and keeps them atomic) when instances
+    # run concurrently.
+    write_lock = threading.Lock()
+
+    # Error sidecar, opened on first failure so clean runs leave no file.
+    # Callers hold write_lock.
+    errors_file = None
+
+    def record_error(instance_id: str, exc: Exception) -> None:
+        nonlocal errors_file
+        if errors_file is None:
+            errors_file = (logs_dir / "errors.jsonl").open(
+                "a", encoding="utf-8", buffering=1
+            )
+        errors_file.write(
+            json.dumps(
+                {"error": repr(exc), "instance_id": instance_id},
+                sort_keys=True,
+                ensure_ascii=False,
+            )
+            + "\n"
+        )
+
+    start = time.monotonic()
+
+    def deadline_exceeded() -> bool:
+        return args.deadline_s is not None and time.monotonic() - start > args.deadline_s
+
+    def process_instance(i: int, instance: dict) -> None:
         instance_id = instance["instance_id"]
 
-        # Skip if already completed
+        # Completed/skipped IDs are filtered before dispatch; this only
+        # guards against duplicate IDs within one run.
         if instance_id in completed_ids:
-            print(f"[{i+1}/{len(instances)}] {instance_id} - SKIPPED (already done)")
-            continue
+            return
+
+        # Re-check the deadline here too: with concurrency, instances may
+        # be submitted before the deadline but picked up by a worker after
+        # it, and the generate call below is the expensive part.
+        if deadline_exceeded():
+            return
 
-        print(f"[{i+1}/{len(instances)}] {instance_id} - processing...")
+        print(f"[{i+1}/{total}] {instance_id} - processing...")
 
         # Determine context
         context_md: str | None = None
@@ -264,37 +405,7 @@ def main() -> None:
 
         try:
             # Generate patch (or placeholder in dry-run mode)
-            if args.dry_run:
-                patch = ""  # Empty patch for plumbing validation
-            elif args.runner == "single_shot":
-                patch = generate_patch(
-                    instance=instance,
-                    model=args.model,
-                    context_md=context_md,
-                    temperature=0.0,
-                    top_p=1.0,
-                    max_tokens=args.max_tokens,
-                    timeout_s=args.timeout_s,
-                )
-            elif args.runner == "mini_swe_agent":
-                patch = generate_patch_with_mini(
-                    instance=instance,
-                    model=args.model,
-                    context_md=context_md,
-                    timeout_s=args.timeout_s,
-                    cost_limit=args.cost_limit,
-                )
-            elif args.runner == "mini_swe_agent_swebench":
-                patch = generate_patch_with_mini_swebench(
-                    instance=instance,
-                    model=args.model,
-                    context_md=context_md,
-                    timeout_s=args.timeout_s,
-                    traj_dir=logs_dir / "trajectories",
-                    step_limit=args.step_limit,
-                )
-            else:
-                raise ValueError(f"Unknown runner: {args.runner}")
+            patch = generate(instance, context_md)
 
             # Build prediction record
             record = {
@@ -303,12 +414,17 @@ def main() -> None:
                 "model_patch": patch,
             }
 
-            # Append to JSONL
-            append_prediction(preds_path, record)
+            # Append to JSONL and keep the live set current so duplicate
+            # instance ids in the input are not re-run
+            with write_lock:
+                append_prediction(preds_file, record)
+                completed_ids.add(instance_id)
 
             # Write debug log
             # Approximate prompt length (we don't have it here, so estimate)
-            diff_lines = patch.split("\n")[:5] if patch else []
+            # Bounded split: stop after 5 lines instead of splitting a
+            # potentially large patch in full
+            diff_lines = patch.split("\n", 5)[:5] if patch else []
             write_instance_log(
                 logs_dir=logs_dir,
                 instance_id=instance_id,
@@ -328,7 +444,56 @@ def main() -> None:
                 "model_name_or_path": args.model,
                 "model_patch": "",
             }
-            append_prediction(preds_path, record)
+            with write_lock:
+                append_prediction(preds_file, record)
+                completed_ids.add(instance_id)
+                record_error(instance_id, e)
+
+    # Drop completed/skipped instances before dispatch so they never
+    # reach the workers. The filter is applied lazily as the stream is
+    # consumed, so late-arriving completions still count.
+    pending = (
+        (i, instance)
+        for i, instance in enumerate(instances)
+        if instance["instance_id"] not in completed_ids
+        and instance["instance_id"] not in skip_ids
+    )
+
+    # One line-buffered handle for the whole run: each prediction is a
+    # single write, and partial runs still leave complete lines behind
+    # for resume.
+    preds_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with preds_path.open("a", encoding="utf-8", buffering=1) as preds_file:
+            # The LLM/agent calls are I/O-bound (HTTP or subprocess waits), so a
+            # thread pool overlaps them; sequential runs keep the plain loop.
+            if args.max_concurrency > 1:
+                with ThreadPoolExecutor(max_workers=args.max_concurrency) as executor:
+                    # Submit through a bounded window rather than all at
+                    # once: eager submission would drain the lazy instance
+                    # stream immediately (losing the streaming behaviour)
+                    # and leave the deadline check nothing to stop.
+                    window = args.max_concurrency * 2
+                    in_flight: deque = deque()
+                    for i, instance in pending:
+                        if deadline_exceeded():
+                            print("Deadline exceeded; dropping remaining instances.")
+                            break
+                        if len(in_flight) >= window:
+                            in_flight.popleft().result()
+                        in_flight.append(executor.submit(process_instance, i, instance))
+                    while in_flight:
+                        in_flight.popleft().result()
+            else:
+                for i, instance in pending:
+                    if deadline_exceeded():
+                        print("Deadline exceeded; dropping remaining instances.")
+                        break
+                    process_instance(i, instance)
+    finally:
+        if errors_file is not None:
+            errors_file.close()
+            print(f"Errors recorded in {logs_dir / 'errors.jsonl'}")
 
     print()
     print(f"Done. Predictions written to: {preds_path}")
@@ -15,12 +15,16 @@ runs this script for one repo.
 from __future__ import annotations
 
 import argparse
+import os
 import sys
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+_root = os.environ.get("CONTEXTTUNE_ROOT") or os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))
+)
+if _root not in sys.path:
+    sys.path.insert(0, _root)
 
-from context_policy.guidance.tuner import MAX_TUNING_ITERATIONS, TuningConfig, run_tuning_loop
+from context_policy.guidance.constants import MAX_TUNING_ITERATIONS
 
 
 def main() -> None:
@@ -48,6 +52,10 @@ def main() -> None:
     if args.iterations < 0 or args.iterations > MAX_TUNING_ITERATIONS:
         parser.error(f"--iterations must be between 0 and {MAX_TUNING_ITERATIONS}.")
 
+    # Deferred: pulls in the runner/datasets stack, which --help and
+    # argument errors should not pay for
+    from context_policy.guidance.tuner import TuningConfig, run_tuning_loop
+
     config = TuningConfig(
         repo=args.repo,
         commit=args.commit,